@@ -0,0 +1,451 @@
+# ======================================================
+# BENCHMARK DE PUERTA, TABLERO Y REPORTES
+# ======================================================
+# Siembra una base local y lanza una carga mixta a una tasa objetivo,
+# midiendo p50/p95/p99 y throughput por endpoint. El resultado se guarda en
+# benchmarks/resultados/<fecha>_<commit>.json para comparar entre commits.
+#
+#   python benchmarks/benchmark.py                      # SQLite temporal, en proceso
+#   python benchmarks/benchmark.py --db postgresql://... --reiniciar
+#   python benchmarks/benchmark.py --url http://localhost:5000 --db postgresql://...
+#   python benchmarks/benchmark.py --comparar antes.json despues.json
+#   python benchmarks/benchmark.py --replica            # + réplica de lectura local
+#
+# La latencia se mide desde el instante en que la solicitud DEBÍA salir
+# (carga de lazo abierto): si el servidor se atrasa, la espera en cola
+# también cuenta y no se oculta la saturación. Antes de la carga se mide el
+# arranque en intérpretes nuevos: importar, crear_app() y primera solicitud.
+# Con --replica las lecturas de reportes van a una segunda base; el ruteo
+# se verifica en tests/test_replica.py.
+import argparse
+import json
+import os
+import queue
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# Mezcla por defecto: nombre de la carga -> peso relativo
+CARGAS = {
+    "rfid": 60,
+    "estado": 25,
+    "registros": 8,
+    "reporte_pagos": 5,
+    "exportar_csv": 2,
+}
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark del parqueadero")
+    parser.add_argument("--db", help="URL de base de datos (por defecto SQLite temporal)")
+    parser.add_argument("--url", help="Servidor ya levantado; sin esto se usa el cliente de pruebas de Flask")
+    parser.add_argument("--reiniciar", action="store_true", help="Borrar y recrear las tablas antes de sembrar")
+    parser.add_argument("--espacios", type=int, default=60)
+    parser.add_argument("--usuarios", type=int, default=2000)
+    parser.add_argument("--vehiculos", type=int, default=3000)
+    parser.add_argument("--registros", type=int, default=100000, help="Registros históricos cerrados")
+    parser.add_argument("--rps", type=float, default=200, help="Solicitudes por segundo objetivo")
+    parser.add_argument("--duracion", type=float, default=20, help="Segundos de carga")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--mezcla", help="Pesos, ej. rfid=80,estado=20")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--arranques", type=int, default=5, help="Arranques medidos en frío (0 = no medir)")
+    parser.add_argument("--salida", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DESPUES"))
+    parser.add_argument("--replica", nargs="?", const="copia", metavar="URL",
+                        help="Réplica de lectura; sin URL copia la base SQLite sembrada a una segunda base local")
+    return parser.parse_args()
+
+
+# ======================================================
+# SIEMBRA
+# ======================================================
+def placa(i, tipo):
+    letras = "".join(chr(65 + (i // 26 ** k) % 26) for k in (2, 1, 0))
+    if tipo == 1:
+        return f"{letras}{i % 1000:03d}"
+    return f"{letras}{i % 100:02d}{chr(65 + (i // 100) % 26)}"
+
+
+def sembrar(p, app, args):
+    rnd = random.Random(args.semilla)
+    db = p.db
+    with app.app_context():
+        if args.reiniciar:
+            db.drop_all()
+        p.migrar()
+        if db.engine.dialect.name == "sqlite":
+            # Sin WAL los lectores bloquean a los escritores y la carga se traba
+            # esperando locks del archivo, no midiendo la aplicación
+            with db.engine.connect() as conexion:
+                conexion.exec_driver_sql("PRAGMA journal_mode=WAL")
+        if p.Espacio.query.first():
+            print("La base ya tiene datos: se usan tal cual (use --reiniciar para sembrar de nuevo)")
+        else:
+            inicio = time.perf_counter()
+            db.session.add_all([p.TipoDocumento(nombre=n) for n in ("CC", "TI", "NIT", "PAS")])
+            db.session.add_all([p.TipoVehiculo(id=1, nombre="carro"), p.TipoVehiculo(id=2, nombre="moto")])
+            db.session.flush()
+            db.session.add_all([p.Tarifa(tipo_vehiculo_id=1, tarifa_hora=3000.0),
+                                p.Tarifa(tipo_vehiculo_id=2, tarifa_hora=1500.0)])
+            db.session.add(p.ValorMinimo(valor=5000))
+            motos = max(1, args.espacios // 4)
+            db.session.execute(p.Espacio.__table__.insert(), [
+                {"id": i, "tipo_vehiculo_id": 2 if i > args.espacios - motos else 1, "estado": False}
+                for i in range(1, args.espacios + 1)])
+            db.session.execute(p.Usuario.__table__.insert(), [
+                {"id": i, "nombre": f"Usuario {i}", "tipo_documento_id": 1,
+                 "numero_identificacion": f"{10000000 + i}", "saldo_centavos": 10 ** 10}
+                for i in range(1, args.usuarios + 1)])
+            tipos = {}
+            filas = []
+            for i in range(1, args.vehiculos + 1):
+                tipos[i] = 2 if rnd.random() < 0.25 else 1
+                filas.append({"id": i, "usuario_id": rnd.randint(1, args.usuarios), "placa": placa(i, tipos[i]),
+                              "tipo_vehiculo_id": tipos[i], "uid_rfid": f"B{i:07X}"})
+            db.session.execute(p.Vehiculo.__table__.insert(), filas)
+
+            espacios_por_tipo = {1: list(range(1, args.espacios - motos + 1)),
+                                 2: list(range(args.espacios - motos + 1, args.espacios + 1))}
+            base = datetime.now() - timedelta(days=90)
+            lote = []
+            for _ in range(args.registros):
+                vehiculo_id = rnd.randint(1, args.vehiculos)
+                ingreso = base + timedelta(minutes=rnd.randint(0, 89 * 24 * 60))
+                minutos = rnd.randint(5, 600)
+                lote.append({"vehiculo_id": vehiculo_id,
+                             "espacio_id": rnd.choice(espacios_por_tipo[tipos[vehiculo_id]]),
+                             "hora_ingreso": ingreso, "hora_salida": ingreso + timedelta(minutes=minutos),
+                             "tiempo_duracion": minutos, "total_pago": minutos * 50.0})
+                if len(lote) == 10000:
+                    db.session.execute(p.Registro.__table__.insert(), lote)
+                    lote = []
+            if lote:
+                db.session.execute(p.Registro.__table__.insert(), lote)
+            db.session.commit()
+            p.reconstruir_recaudo()
+            print(f"Siembra: {args.espacios} espacios, {args.usuarios} usuarios, {args.vehiculos} vehículos, "
+                  f"{args.registros} registros en {time.perf_counter() - inicio:.1f} s")
+
+        uids = [v.uid_rfid for v in p.Vehiculo.query.with_entities(p.Vehiculo.uid_rfid)]
+        p.indice_espacios.cargar()
+        p.cache_referencia.cargar()
+    return uids
+
+
+def copiar_replica(p, app, destino):
+    # Segunda base local con los mismos datos que la primaria recién sembrada
+    # (API de respaldo de SQLite: copia consistente aunque haya conexiones
+    # abiertas). Después de la copia solo la primaria recibe escrituras.
+    with app.app_context():
+        origen = p.db.engine.url.database
+    with sqlite3.connect(origen) as fuente, sqlite3.connect(destino) as copia:
+        fuente.backup(copia)
+
+
+# ======================================================
+# ARRANQUE
+# ======================================================
+# Corre en un intérprete nuevo contra la base ya sembrada. La primera
+# solicitud paga la conexión y la carga perezosa de catálogos e índice.
+SCRIPT_ARRANQUE = """
+import json, sys, time
+inicio = time.perf_counter()
+import parqueadero
+importado = time.perf_counter()
+app = parqueadero.crear_app()
+creada = time.perf_counter()
+cliente = app.test_client()
+solicitudes = []
+for ruta in ("/parqueadero/estado", "/parqueadero/estado"):
+    t = time.perf_counter()
+    codigo = cliente.get(ruta).status_code
+    solicitudes.append((time.perf_counter() - t) * 1000)
+    assert codigo == 200, codigo
+print(json.dumps({
+    "importar_ms": (importado - inicio) * 1000,
+    "crear_app_ms": (creada - importado) * 1000,
+    "primera_solicitud_ms": solicitudes[0],
+    "segunda_solicitud_ms": solicitudes[1],
+    "modulos_pesados": [m for m in ("openpyxl", "numpy") if m in sys.modules],
+}))
+"""
+
+
+def medir_arranque(repeticiones):
+    medidas = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", SCRIPT_ARRANQUE], cwd=RAIZ,
+                                capture_output=True, text=True, check=True).stdout
+        medidas.append(json.loads(salida.strip().splitlines()[-1]))
+    resultado = {clave: round(sorted(m[clave] for m in medidas)[len(medidas) // 2], 1)
+                 for clave in medidas[0] if clave.endswith("_ms")}
+    resultado["modulos_pesados"] = medidas[0]["modulos_pesados"]
+    resultado["repeticiones"] = repeticiones
+    return resultado
+
+
+# ======================================================
+# CLIENTES
+# ======================================================
+class ClienteLocal:
+    # Llama a la app en el mismo proceso (sin red ni servidor WSGI)
+    def __init__(self, app):
+        self.app = app
+
+    def llamar(self, metodo, ruta, cuerpo=None):
+        cliente = self.app.test_client()
+        respuesta = cliente.open(ruta, method=metodo, json=cuerpo)
+        respuesta.get_data()
+        return respuesta.status_code
+
+
+class ClienteHttp:
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def llamar(self, metodo, ruta, cuerpo=None):
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        solicitud = urllib.request.Request(self.url + ruta, data=datos, method=metodo,
+                                           headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(solicitud, timeout=30) as respuesta:
+                respuesta.read()
+                return respuesta.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+# ======================================================
+# CARGA
+# ======================================================
+class Generador:
+    # Arma la siguiente solicitud de cada tipo de carga
+    def __init__(self, uids, semilla):
+        self.uids = uids
+        self.rnd = random.Random(semilla)
+        self.adentro = set()
+        self._lock = threading.Lock()
+        hoy = datetime.now()
+        self.mes = ((hoy - timedelta(days=30)).strftime("%Y-%m-%d"), hoy.strftime("%Y-%m-%d"))
+        self.ayer = (hoy - timedelta(days=1)).strftime("%Y-%m-%d")
+        self.anio = ((hoy - timedelta(days=365)).strftime("%Y-%m-%d"), hoy.strftime("%Y-%m-%d"))
+
+    def solicitud(self, carga):
+        with self._lock:
+            if carga == "rfid":
+                # Mitad salidas de los que están adentro, así el lote no se llena
+                if self.adentro and self.rnd.random() < 0.5:
+                    uid = self.rnd.choice(tuple(self.adentro))
+                else:
+                    uid = self.rnd.choice(self.uids)
+                tipo = "OUT" if uid in self.adentro else "IN"
+                (self.adentro.discard if tipo == "OUT" else self.adentro.add)(uid)
+                return "POST", "/rfid", {"uid": uid, "tipo": tipo}
+            if carga == "estado":
+                return "GET", "/parqueadero/estado", None
+            if carga == "registros":
+                return "GET", f"/registros?limit=100&after_id={self.rnd.randint(0, 50000)}", None
+            if carga == "reporte_pagos":
+                return "GET", f"/reportes/pagos?fecha_inicio={self.mes[0]}&fecha_fin={self.mes[1]}&agrupar=dia", None
+            if carga == "exportar_csv":
+                return "GET", f"/registros?formato=csv&fecha_inicio={self.ayer}", None
+            if carga == "ocupacion":
+                # Fuera de la mezcla por defecto: --mezcla ...,ocupacion=2
+                return "GET", f"/reportes/ocupacion?fecha_inicio={self.anio[0]}&fecha_fin={self.anio[1]}&granularidad=dia", None
+        raise ValueError(carga)
+
+
+def percentil(ordenados, q):
+    if not ordenados:
+        return None
+    indice = min(len(ordenados) - 1, max(0, int(round(q / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def ejecutar_carga(cliente, generador, args, mezcla):
+    rnd = random.Random(args.semilla)
+    nombres = list(mezcla)
+    pesos = [mezcla[n] for n in nombres]
+    total = int(args.rps * args.duracion)
+    plan = [(i / args.rps, rnd.choices(nombres, pesos)[0]) for i in range(total)]
+
+    pendientes = queue.Queue()
+    medidas = {n: [] for n in nombres}
+    errores = {n: 0 for n in nombres}
+    lock = threading.Lock()
+    inicio = time.perf_counter() + 0.5
+
+    def trabajador():
+        while True:
+            tarea = pendientes.get()
+            if tarea is None:
+                return
+            programado, carga = tarea
+            espera = inicio + programado - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            metodo, ruta, cuerpo = generador.solicitud(carga)
+            try:
+                codigo = cliente.llamar(metodo, ruta, cuerpo)
+            except Exception:
+                codigo = 599
+            latencia = time.perf_counter() - (inicio + programado)
+            with lock:
+                medidas[carga].append(latencia)
+                if codigo >= 500:
+                    errores[carga] += 1
+
+    hilos = [threading.Thread(target=trabajador, daemon=True) for _ in range(args.hilos)]
+    for h in hilos:
+        h.start()
+    for tarea in plan:
+        pendientes.put(tarea)
+    for _ in hilos:
+        pendientes.put(None)
+    for h in hilos:
+        h.join()
+    duracion_real = time.perf_counter() - inicio
+
+    resultados = {}
+    for carga in nombres:
+        ordenadas = sorted(medidas[carga])
+        if not ordenadas:
+            continue
+        resultados[carga] = {
+            "solicitudes": len(ordenadas),
+            "errores": errores[carga],
+            "rps": round(len(ordenadas) / duracion_real, 1),
+            "p50_ms": round(percentil(ordenadas, 50) * 1000, 2),
+            "p95_ms": round(percentil(ordenadas, 95) * 1000, 2),
+            "p99_ms": round(percentil(ordenadas, 99) * 1000, 2),
+            "max_ms": round(ordenadas[-1] * 1000, 2),
+        }
+    todas = sum(len(m) for m in medidas.values())
+    return resultados, {"solicitudes": todas, "duracion_s": round(duracion_real, 2),
+                        "rps_logrado": round(todas / duracion_real, 1)}
+
+
+# ======================================================
+# RESULTADOS
+# ======================================================
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def imprimir(resultados):
+    print(f"{'endpoint':<15}{'n':>8}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for carga, r in resultados.items():
+        print(f"{carga:<15}{r['solicitudes']:>8}{r['errores']:>6}{r['rps']:>9}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+
+
+def comparar(antes, despues):
+    with open(antes, encoding="utf-8") as f:
+        a = json.load(f)
+    with open(despues, encoding="utf-8") as f:
+        b = json.load(f)
+    print(f"{a['commit']} -> {b['commit']}")
+    print(f"{'endpoint':<15}{'p50 ms':>20}{'p95 ms':>20}{'p99 ms':>20}")
+    for carga in b["resultados"]:
+        if carga not in a["resultados"]:
+            continue
+        celdas = []
+        for m in ("p50_ms", "p95_ms", "p99_ms"):
+            x, y = a["resultados"][carga][m], b["resultados"][carga][m]
+            cambio = (y - x) / x * 100 if x else 0.0
+            celdas.append(f"{x:.1f}->{y:.1f} ({cambio:+.0f}%)")
+        print(f"{carga:<15}" + "".join(f"{c:>20}" for c in celdas))
+    if "arranque" in a and "arranque" in b:
+        for m in ("importar_ms", "crear_app_ms", "primera_solicitud_ms"):
+            x, y = a["arranque"][m], b["arranque"][m]
+            cambio = (y - x) / x * 100 if x else 0.0
+            print(f"arranque {m:<22}{x:.1f}->{y:.1f} ({cambio:+.0f}%)")
+
+
+def main():
+    args = argumentos()
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    mezcla = dict(CARGAS)
+    if args.mezcla:
+        mezcla = {n: float(w) for n, w in (par.split("=") for par in args.mezcla.split(","))}
+
+    if not args.db:
+        ruta = os.path.join(tempfile.gettempdir(), "parqueadero_benchmark.db")
+        for archivo in (ruta, ruta + "-wal", ruta + "-shm"):
+            if os.path.exists(archivo):
+                os.remove(archivo)
+        args.db = f"sqlite:///{ruta}"
+    os.environ["DATABASE_URL"] = args.db
+    copia_replica = None
+    if args.replica == "copia":
+        if not args.db.startswith("sqlite:///"):
+            sys.exit("--replica sin URL solo copia bases SQLite; indique la URL de la réplica")
+        copia_replica = args.db[len("sqlite:///"):] + ".replica"
+        for archivo in (copia_replica, copia_replica + "-wal", copia_replica + "-shm"):
+            if os.path.exists(archivo):
+                os.remove(archivo)
+        args.replica = f"sqlite:///{copia_replica}"
+    if args.replica:
+        os.environ["DATABASE_URL_LECTURA"] = args.replica
+    sys.path.insert(0, RAIZ)
+    import parqueadero as p
+
+    app = p.crear_app()
+    uids = sembrar(p, app, args)
+    if copia_replica:
+        copiar_replica(p, app, copia_replica)
+    arranque = None
+    if args.arranques:
+        arranque = medir_arranque(args.arranques)
+        print(f"Arranque (mediana de {args.arranques}): importar {arranque['importar_ms']} ms, "
+              f"crear_app {arranque['crear_app_ms']} ms, primera solicitud {arranque['primera_solicitud_ms']} ms, "
+              f"segunda {arranque['segunda_solicitud_ms']} ms")
+    cliente = ClienteHttp(args.url) if args.url else ClienteLocal(app)
+    generador = Generador(uids, args.semilla)
+
+    print(f"Carga: {args.rps} rps durante {args.duracion} s con {args.hilos} hilos ({'HTTP ' + args.url if args.url else 'en proceso'})")
+    resultados, resumen = ejecutar_carga(cliente, generador, args, mezcla)
+    imprimir(resultados)
+    print(f"Total: {resumen['solicitudes']} solicitudes, {resumen['rps_logrado']} rps logrados")
+
+    salida = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "base_datos": args.db.split("://")[0],
+        "modo": "http" if args.url else "en_proceso",
+        "configuracion": {k: getattr(args, k) for k in
+                          ("espacios", "usuarios", "vehiculos", "registros", "rps", "duracion", "hilos", "semilla")},
+        "mezcla": mezcla,
+        "resumen": resumen,
+        "resultados": resultados,
+        "arranque": arranque,
+        "replica": bool(args.replica),
+    }
+    archivo = args.salida or os.path.join(
+        RESULTADOS, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{salida['commit']}.json")
+    os.makedirs(os.path.dirname(archivo), exist_ok=True)
+    with open(archivo, "w", encoding="utf-8") as f:
+        json.dump(salida, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {archivo}")
+
+
+if __name__ == "__main__":
+    main()
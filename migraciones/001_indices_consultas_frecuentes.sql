@@ -0,0 +1,49 @@
+-- ======================================================
+-- MIGRACIÓN 001: índices para las consultas frecuentes
+-- ======================================================
+-- Ejecutar con psql (cada sentencia en su propia transacción:
+-- CREATE INDEX CONCURRENTLY no puede ir dentro de BEGIN/COMMIT):
+--   psql -d parqueadero -f migraciones/001_indices_consultas_frecuentes.sql
+
+CREATE TABLE IF NOT EXISTS migraciones_aplicadas (
+    version VARCHAR(100) PRIMARY KEY,
+    fecha_aplicacion TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Antes de crear el índice único, cerrar a mano las estadías duplicadas.
+-- Esta consulta debe devolver 0 filas:
+--   SELECT vehiculo_id, COUNT(*) FROM registros
+--   WHERE hora_salida IS NULL GROUP BY vehiculo_id HAVING COUNT(*) > 1;
+
+-- Puerta de entrada/salida: estadía abierta del vehículo
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_registros_vehiculo_salida
+    ON registros (vehiculo_id, hora_salida);
+
+-- Como máximo una estadía abierta por vehículo
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_registros_estadia_abierta
+    ON registros (vehiculo_id)
+    WHERE hora_salida IS NULL;
+
+-- Reportes por rango de fechas (/reportes/pagos, /registros); incluye el
+-- monto para sumar sin leer la tabla
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_registros_hora_ingreso
+    ON registros (hora_ingreso) INCLUDE (total_pago);
+
+-- Espacios libres por tipo y vehículo estacionado
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_espacios_tipo_estado
+    ON espacios (tipo_vehiculo_id, estado);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_espacios_vehiculo
+    ON espacios (vehiculo_id)
+    WHERE vehiculo_id IS NOT NULL;
+
+-- Historial de recargas por usuario
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recargas_usuario_fecha
+    ON recargas (usuario_id, fecha_recarga);
+
+ANALYZE registros;
+ANALYZE espacios;
+ANALYZE recargas;
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('001_indices_consultas_frecuentes')
+ON CONFLICT (version) DO NOTHING;
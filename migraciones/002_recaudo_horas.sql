@@ -0,0 +1,39 @@
+-- ======================================================
+-- MIGRACIÓN 002: recaudo pre-agregado por hora
+-- ======================================================
+-- Tabla que /reportes/pagos usa para los totales. La aplicación la
+-- mantiene al cerrar cada estadía; aquí se carga el histórico.
+--   psql -d parqueadero -f migraciones/002_recaudo_horas.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS recaudo_horas (
+    hora TIMESTAMP NOT NULL,              -- hora_ingreso truncada a la hora
+    tipo_vehiculo_id INT NOT NULL,
+    espacio_id INT NOT NULL,
+    cantidad INT NOT NULL DEFAULT 0,
+    minutos DOUBLE PRECISION NOT NULL DEFAULT 0,
+    total DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (hora, tipo_vehiculo_id, espacio_id),
+    CONSTRAINT fk_recaudo_tipo FOREIGN KEY (tipo_vehiculo_id) REFERENCES tipos_vehiculo(id),
+    CONSTRAINT fk_recaudo_espacio FOREIGN KEY (espacio_id) REFERENCES espacios(id)
+);
+
+-- Carga inicial (equivale a POST /admin/recaudo/reconstruir sin fechas)
+DELETE FROM recaudo_horas;
+INSERT INTO recaudo_horas (hora, tipo_vehiculo_id, espacio_id, cantidad, minutos, total)
+SELECT date_trunc('hour', r.hora_ingreso),
+       e.tipo_vehiculo_id,
+       r.espacio_id,
+       COUNT(*),
+       COALESCE(SUM(r.tiempo_duracion), 0),
+       COALESCE(SUM(r.total_pago), 0)
+FROM registros r
+JOIN espacios e ON e.id = r.espacio_id
+WHERE r.hora_salida IS NOT NULL
+GROUP BY 1, 2, 3;
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('002_recaudo_horas')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,38 @@
+-- ======================================================
+-- MIGRACIÓN 003: saldo en centavos y libro de movimientos
+-- ======================================================
+-- Ejecutar UNA sola vez, con la aplicación detenida:
+--   psql -d parqueadero -f migraciones/003_libro_saldos.sql
+
+BEGIN;
+
+ALTER TABLE usuarios ADD COLUMN saldo_centavos BIGINT NOT NULL DEFAULT 0;
+UPDATE usuarios SET saldo_centavos = ROUND(COALESCE(saldo, 0)::NUMERIC * 100);
+
+CREATE TABLE movimientos_saldo (
+    id SERIAL PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    tipo VARCHAR(20) NOT NULL,            -- APERTURA, RECARGA, COBRO
+    monto_centavos BIGINT NOT NULL,       -- + abono, - cargo
+    saldo_centavos BIGINT NOT NULL,       -- saldo resultante
+    registro_id INT NULL,
+    recarga_id INT NULL,
+    fecha TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT fk_movimiento_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios(id),
+    CONSTRAINT fk_movimiento_registro FOREIGN KEY (registro_id) REFERENCES registros(id),
+    CONSTRAINT fk_movimiento_recarga FOREIGN KEY (recarga_id) REFERENCES recargas(id)
+);
+
+CREATE INDEX ix_movimientos_usuario_fecha ON movimientos_saldo (usuario_id, fecha);
+
+-- Apertura: el saldo actual de cada usuario es su primer movimiento, así la
+-- suma del libro coincide con usuarios.saldo_centavos
+INSERT INTO movimientos_saldo (usuario_id, tipo, monto_centavos, saldo_centavos)
+SELECT id, 'APERTURA', saldo_centavos, saldo_centavos FROM usuarios;
+
+ALTER TABLE usuarios DROP COLUMN saldo;
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('003_libro_saldos')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
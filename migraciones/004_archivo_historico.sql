@@ -0,0 +1,21 @@
+-- ======================================================
+-- MIGRACIÓN 004: archivo histórico de registros y recargas
+-- ======================================================
+-- Los registros y recargas viejos salen de la BD a archivos comprimidos
+-- (python parqueadero.py archivar). El libro de saldos conserva sus ids, así
+-- que movimientos_saldo deja de tener llave foránea hacia esas tablas.
+--   python parqueadero.py migrar
+--   (o: psql -d parqueadero -f migraciones/004_archivo_historico.sql)
+
+BEGIN;
+
+-- Nombres de la migración 003 y de las bases creadas con create_all
+ALTER TABLE movimientos_saldo DROP CONSTRAINT IF EXISTS fk_movimiento_registro;
+ALTER TABLE movimientos_saldo DROP CONSTRAINT IF EXISTS fk_movimiento_recarga;
+ALTER TABLE movimientos_saldo DROP CONSTRAINT IF EXISTS movimientos_saldo_registro_id_fkey;
+ALTER TABLE movimientos_saldo DROP CONSTRAINT IF EXISTS movimientos_saldo_recarga_id_fkey;
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('004_archivo_historico')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,37 @@
+-- ======================================================
+-- MIGRACIÓN 005: varias sedes (lotes)
+-- ======================================================
+-- Espacios, registros y tarifas pasan a tener sede. Todo lo existente queda
+-- en la sede 1 (Principal); las tarifas sin sede siguen siendo generales.
+--   python parqueadero.py migrar
+--   (o: psql -d parqueadero -f migraciones/005_sedes.sql)
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS sedes (
+    id SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) UNIQUE NOT NULL
+);
+
+INSERT INTO sedes (id, nombre) VALUES (1, 'Principal') ON CONFLICT DO NOTHING;
+SELECT setval(pg_get_serial_sequence('sedes', 'id'), (SELECT MAX(id) FROM sedes));
+
+-- Con DEFAULT constante PostgreSQL no reescribe las tablas
+ALTER TABLE espacios ADD COLUMN IF NOT EXISTS sede_id INT NOT NULL DEFAULT 1 REFERENCES sedes(id);
+ALTER TABLE registros ADD COLUMN IF NOT EXISTS sede_id INT NOT NULL DEFAULT 1 REFERENCES sedes(id);
+ALTER TABLE tarifas ADD COLUMN IF NOT EXISTS sede_id INT REFERENCES sedes(id);
+
+COMMIT;
+
+-- Espacios libres por sede y tipo (reemplaza a ix_espacios_tipo_estado)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_espacios_sede_tipo_estado
+    ON espacios (sede_id, tipo_vehiculo_id, estado);
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_espacios_tipo_estado;
+
+-- Reportes de una sede por rango de fechas
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_registros_sede_hora_ingreso
+    ON registros (sede_id, hora_ingreso);
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('005_sedes')
+ON CONFLICT (version) DO NOTHING;
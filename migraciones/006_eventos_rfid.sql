@@ -0,0 +1,23 @@
+-- ======================================================
+-- MIGRACIÓN 006: eventos de puerta de /rfid/batch
+-- ======================================================
+-- Tabla con la que /rfid/batch descarta eventos ya procesados cuando un
+-- dispositivo reenvía su lote (deduplicación por id del dispositivo).
+--   python parqueadero.py migrar
+--   (o: psql -d parqueadero -f migraciones/006_eventos_rfid.sql)
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS eventos_rfid (
+    id VARCHAR(64) PRIMARY KEY,           -- id generado por el dispositivo
+    uid VARCHAR(20) NOT NULL,
+    tipo VARCHAR(10) NOT NULL,
+    fecha_evento TIMESTAMP NOT NULL,
+    fecha_proceso TIMESTAMP DEFAULT NOW(),
+    resultado TEXT NOT NULL               -- respuesta JSON entregada
+);
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('006_eventos_rfid')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- ======================================================
+-- MIGRACIÓN 007: ocupación física reportada por los sensores
+-- ======================================================
+-- Último estado que /puesto confirmó para cada espacio; NULL = sin lectura.
+-- Sin DEFAULT PostgreSQL solo cambia el catálogo, no reescribe la tabla.
+--   python parqueadero.py migrar
+--   (o: psql -d parqueadero -f migraciones/007_sensores_espacios.sql)
+
+BEGIN;
+
+ALTER TABLE espacios
+ADD COLUMN IF NOT EXISTS ocupado_sensor BOOLEAN,
+ADD COLUMN IF NOT EXISTS sensor_actualizado TIMESTAMP;
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('007_sensores_espacios')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- ======================================================
+-- MIGRACIÓN 008: recaudo pre-agregado por sede
+-- ======================================================
+-- recaudo_horas pasa a tener sede en la llave, para que /reportes/pagos
+-- con sede_id filtre los totales igual que el detalle. Las filas
+-- existentes toman la sede de su espacio.
+--   python parqueadero.py migrar
+--   (o: psql -d parqueadero -f migraciones/008_recaudo_por_sede.sql)
+
+BEGIN;
+
+ALTER TABLE recaudo_horas ADD COLUMN IF NOT EXISTS sede_id INT NOT NULL DEFAULT 1 REFERENCES sedes(id);
+
+UPDATE recaudo_horas rh
+SET sede_id = e.sede_id
+FROM espacios e
+WHERE e.id = rh.espacio_id AND rh.sede_id <> e.sede_id;
+
+-- Llave con la sede después de la hora: los reportes filtran por rango de horas
+ALTER TABLE recaudo_horas DROP CONSTRAINT IF EXISTS recaudo_horas_pkey;
+ALTER TABLE recaudo_horas ADD PRIMARY KEY (hora, sede_id, tipo_vehiculo_id, espacio_id);
+
+INSERT INTO migraciones_aplicadas (version) VALUES ('008_recaudo_por_sede')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
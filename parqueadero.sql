@@ -23,7 +23,7 @@ CREATE TABLE IF NOT EXISTS usuarios (
     nombre VARCHAR(100) NOT NULL,
     tipo_documento_id INT NOT NULL,
     numero_identificacion VARCHAR(20) UNIQUE NOT NULL,
-    saldo DOUBLE PRECISION DEFAULT 0.0,
+    saldo_centavos BIGINT NOT NULL DEFAULT 0,   -- saldo en centavos; cada cambio deja un movimiento
     CONSTRAINT fk_tipo_doc FOREIGN KEY (tipo_documento_id) REFERENCES tipos_documento(id)
 );
 SELECT * FROM usuarios
@@ -43,6 +43,14 @@ CREATE TABLE IF NOT EXISTS vehiculos (
     CONSTRAINT fk_tipo_vehiculo FOREIGN KEY (tipo_vehiculo_id) REFERENCES tipos_vehiculo(id)
 );
 
+-- Sedes (lotes) del parqueadero
+CREATE TABLE IF NOT EXISTS sedes (
+    id SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) UNIQUE NOT NULL
+);
+INSERT INTO sedes (id, nombre) VALUES (1, 'Principal') ON CONFLICT DO NOTHING;
+SELECT setval(pg_get_serial_sequence('sedes', 'id'), (SELECT MAX(id) FROM sedes));
+
 -- Espacios de parqueadero
 CREATE TABLE IF NOT EXISTS espacios (
     id SERIAL PRIMARY KEY,
@@ -53,6 +61,15 @@ CREATE TABLE IF NOT EXISTS espacios (
     CONSTRAINT fk_vehiculo_espacio FOREIGN KEY (vehiculo_id) REFERENCES vehiculos(id)
 );
 
+-- Ocupación física reportada por los sensores (/puesto); NULL = sin lectura
+ALTER TABLE espacios
+ADD COLUMN IF NOT EXISTS ocupado_sensor BOOLEAN,
+ADD COLUMN IF NOT EXISTS sensor_actualizado TIMESTAMP;
+
+-- Sede del espacio
+ALTER TABLE espacios
+ADD COLUMN IF NOT EXISTS sede_id INT NOT NULL DEFAULT 1 REFERENCES sedes(id);
+
 -- Tarifas
 CREATE TABLE IF NOT EXISTS tarifas (
     id SERIAL PRIMARY KEY,
@@ -61,6 +78,10 @@ CREATE TABLE IF NOT EXISTS tarifas (
     CONSTRAINT fk_tipo_vehiculo_tarifa FOREIGN KEY (tipo_vehiculo_id) REFERENCES tipos_vehiculo(id));
 	SELECT*FROM tarifas;
 
+-- Tarifa propia de una sede; NULL = aplica en todas
+ALTER TABLE tarifas
+ADD COLUMN IF NOT EXISTS sede_id INT REFERENCES sedes(id);
+
 
 -- Registros (historial de parqueo)
 CREATE TABLE IF NOT EXISTS registros (
@@ -75,6 +96,10 @@ CREATE TABLE IF NOT EXISTS registros (
     CONSTRAINT fk_registro_espacio FOREIGN KEY (espacio_id) REFERENCES espacios(id)
 );
 
+-- Sede donde ocurrió la estadía (copia de la del espacio)
+ALTER TABLE registros
+ADD COLUMN IF NOT EXISTS sede_id INT NOT NULL DEFAULT 1 REFERENCES sedes(id);
+
 -- Recargas de saldo
 CREATE TABLE IF NOT EXISTS recargas (
     id SERIAL PRIMARY KEY,
@@ -87,6 +112,89 @@ CREATE TABLE IF NOT EXISTS recargas (
     CONSTRAINT fk_recarga_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
 );
 
+-- Libro de movimientos de saldo: solo se insertan filas. Sin llave foránea
+-- a registros ni recargas: pueden estar ya en el archivo histórico
+CREATE TABLE IF NOT EXISTS movimientos_saldo (
+    id SERIAL PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    tipo VARCHAR(20) NOT NULL,            -- APERTURA, RECARGA, COBRO
+    monto_centavos BIGINT NOT NULL,       -- + abono, - cargo
+    saldo_centavos BIGINT NOT NULL,       -- saldo resultante
+    registro_id INT NULL,
+    recarga_id INT NULL,
+    fecha TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT fk_movimiento_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_movimientos_usuario_fecha ON movimientos_saldo (usuario_id, fecha);
+
+-- Eventos de puerta procesados por /rfid/batch (deduplicación por id del dispositivo)
+CREATE TABLE IF NOT EXISTS eventos_rfid (
+    id VARCHAR(64) PRIMARY KEY,
+    uid VARCHAR(20) NOT NULL,
+    tipo VARCHAR(10) NOT NULL,
+    fecha_evento TIMESTAMP NOT NULL,
+    fecha_proceso TIMESTAMP DEFAULT NOW(),
+    resultado TEXT NOT NULL
+);
+
+-- Recaudo pre-agregado por hora de ingreso, sede, tipo y espacio
+-- (/reportes/pagos); la aplicación lo mantiene al cerrar cada estadía
+CREATE TABLE IF NOT EXISTS recaudo_horas (
+    hora TIMESTAMP NOT NULL,              -- hora_ingreso truncada a la hora
+    sede_id INT NOT NULL DEFAULT 1,
+    tipo_vehiculo_id INT NOT NULL,
+    espacio_id INT NOT NULL,
+    cantidad INT NOT NULL DEFAULT 0,
+    minutos DOUBLE PRECISION NOT NULL DEFAULT 0,
+    total DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (hora, sede_id, tipo_vehiculo_id, espacio_id),
+    CONSTRAINT fk_recaudo_sede FOREIGN KEY (sede_id) REFERENCES sedes(id),
+    CONSTRAINT fk_recaudo_tipo FOREIGN KEY (tipo_vehiculo_id) REFERENCES tipos_vehiculo(id),
+    CONSTRAINT fk_recaudo_espacio FOREIGN KEY (espacio_id) REFERENCES espacios(id)
+);
+
+-- Migraciones ya incluidas en este archivo (python parqueadero.py migrar
+-- solo ejecuta las que falten)
+CREATE TABLE IF NOT EXISTS migraciones_aplicadas (
+    version VARCHAR(100) PRIMARY KEY,
+    fecha_aplicacion TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- ===================================
+-- ÍNDICES (migraciones 001 y 005)
+-- ===================================
+-- Puerta de entrada/salida: estadía abierta del vehículo
+CREATE INDEX IF NOT EXISTS ix_registros_vehiculo_salida
+    ON registros (vehiculo_id, hora_salida);
+
+-- Como máximo una estadía abierta por vehículo
+CREATE UNIQUE INDEX IF NOT EXISTS ux_registros_estadia_abierta
+    ON registros (vehiculo_id)
+    WHERE hora_salida IS NULL;
+
+-- Reportes por rango de fechas, también por sede
+CREATE INDEX IF NOT EXISTS ix_registros_hora_ingreso
+    ON registros (hora_ingreso) INCLUDE (total_pago);
+CREATE INDEX IF NOT EXISTS ix_registros_sede_hora_ingreso
+    ON registros (sede_id, hora_ingreso);
+
+-- Espacios libres por sede y tipo, y vehículo estacionado
+CREATE INDEX IF NOT EXISTS ix_espacios_sede_tipo_estado
+    ON espacios (sede_id, tipo_vehiculo_id, estado);
+CREATE INDEX IF NOT EXISTS ix_espacios_vehiculo
+    ON espacios (vehiculo_id)
+    WHERE vehiculo_id IS NOT NULL;
+
+-- Historial de recargas por usuario
+CREATE INDEX IF NOT EXISTS ix_recargas_usuario_fecha
+    ON recargas (usuario_id, fecha_recarga);
+
+INSERT INTO migraciones_aplicadas (version)
+VALUES ('001_indices_consultas_frecuentes'), ('002_recaudo_horas'), ('003_libro_saldos'),
+       ('004_archivo_historico'), ('005_sedes'), ('008_recaudo_por_sede')
+ON CONFLICT (version) DO NOTHING;
+
 -- tipos de documentos 
 DELETE FROM tipos_documento;
 INSERT INTO tipos_documento (nombre)
@@ -0,0 +1,92 @@
+# ======================================================
+# SERVIDOR DE PRODUCCIÓN
+# ======================================================
+# Uso: python servidor.py [config.json]
+# Toda la configuración sale de variables de entorno (DATABASE_URL,
+# PARQUEADERO_*). El JSON opcional usa las mismas claves y solo completa lo
+# que el entorno no define.
+import json
+import multiprocessing
+import os
+import sys
+
+
+def cargar_config(ruta):
+    if not ruta:
+        return
+    with open(ruta, encoding="utf-8") as f:
+        for clave, valor in json.load(f).items():
+            os.environ.setdefault(clave, str(valor))
+
+
+def ajustes():
+    workers = int(os.environ.get("PARQUEADERO_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+    hilos = int(os.environ.get("PARQUEADERO_HILOS", 8))
+
+    # Cada hilo puede tener una conexión abierta: el pool debe alcanzar
+    os.environ.setdefault("PARQUEADERO_POOL_SIZE", str(hilos))
+    # Con varios procesos el último RFID leído y los eventos del tablero deben
+    # compartirse entre ellos
+    if workers > 1:
+        os.environ.setdefault("PARQUEADERO_ESTADO_PUERTAS", "sqlite")
+        os.environ.setdefault("PARQUEADERO_EVENTOS", "sqlite")
+    # Cada panel en vivo retiene un hilo mientras está conectado: como máximo
+    # una cuarta parte, el resto queda para las puertas (/rfid)
+    os.environ.setdefault("PARQUEADERO_EVENTOS_MAX_CONEXIONES", str(max(1, hilos // 4)))
+    os.environ.setdefault("PARQUEADERO_DEBUG", "0")
+
+    return {
+        "bind": os.environ.get("PARQUEADERO_BIND", "0.0.0.0:5000"),
+        "workers": workers,
+        "threads": hilos,
+        "timeout": int(os.environ.get("PARQUEADERO_TIMEOUT", 60)),
+        "max_requests": int(os.environ.get("PARQUEADERO_MAX_REQUESTS", 0)),
+    }
+
+
+def servir_gunicorn(opciones):
+    from gunicorn.app.base import BaseApplication
+
+    class Aplicacion(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", opciones["bind"])
+            self.cfg.set("workers", opciones["workers"])
+            self.cfg.set("threads", opciones["threads"])
+            self.cfg.set("worker_class", "gthread")  # hilos: cada conexión SSE ocupa uno mientras dura
+            self.cfg.set("timeout", opciones["timeout"])
+            self.cfg.set("max_requests", opciones["max_requests"])
+            self.cfg.set("max_requests_jitter", opciones["max_requests"] // 10)
+            self.cfg.set("accesslog", "-")
+
+        def load(self):
+            # Se crea en cada worker, después del fork: cada uno abre su propio pool
+            from parqueadero import crear_app
+            return crear_app()
+
+    Aplicacion().run()
+
+
+def servir_waitress(opciones):
+    # Windows no tiene fork: un solo proceso con varios hilos
+    from waitress import serve
+    from parqueadero import crear_app
+    app = crear_app()
+    host, _, puerto = opciones["bind"].rpartition(":")
+    serve(app, host=host or "0.0.0.0", port=int(puerto), threads=opciones["threads"])
+
+
+if __name__ == "__main__":
+    cargar_config(sys.argv[1] if len(sys.argv) > 1 else os.environ.get("PARQUEADERO_CONFIG"))
+    servidor = os.environ.get("PARQUEADERO_SERVIDOR", "gunicorn" if os.name == "posix" else "waitress")
+    if servidor == "waitress":
+        os.environ.setdefault("PARQUEADERO_WORKERS", "1")
+    opciones = ajustes()
+    try:
+        if servidor == "gunicorn":
+            servir_gunicorn(opciones)
+        elif servidor == "waitress":
+            servir_waitress(opciones)
+        else:
+            sys.exit(f"Servidor no soportado: {servidor} (use gunicorn o waitress)")
+    except ImportError as e:
+        sys.exit(f"Falta instalar el servidor '{servidor}': {e}")
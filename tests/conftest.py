@@ -0,0 +1,81 @@
+# ======================================================
+# FIXTURES COMUNES
+# ======================================================
+# Cada prueba usa su propia base SQLite en un directorio temporal (creada con
+# `migrar`, como una base nueva) y singletons de módulo recién creados, para
+# que índices y cachés no arrastren datos de otra prueba.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parqueadero as p  # noqa: E402
+
+SINGLETONS = ("indice_espacios", "indice_busqueda", "instantanea_ocupacion", "cache_referencia",
+              "cache_tarjetas", "cache_ocupacion", "archivo_historico", "agregador_sensores",
+              "estado_replica")
+
+
+def nueva_app(tmp_path, monkeypatch, **config):
+    # App sembrada con catálogos, tarifas y valor mínimo; `config` agrega o
+    # cambia claves (p. ej. una réplica de lectura)
+    for nombre in SINGLETONS:
+        monkeypatch.setattr(p, nombre, type(getattr(p, nombre))())
+    monkeypatch.setitem(p._motor, "version", None)
+
+    app = p.crear_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'parqueadero.db'}",
+        "ARCHIVO_DIRECTORIO": str(tmp_path / "archivo"),
+        "EXPORTACIONES_DIRECTORIO": str(tmp_path / "exportaciones"),
+        "ESTADO_PUERTAS_BACKEND": "memoria",
+        "EVENTOS_BACKEND": "memoria",
+        **config,
+    })
+    with app.app_context():
+        p.migrar()
+        sesion = p.db.session
+        sesion.add_all([p.TipoDocumento(nombre=n) for n in ("CC", "TI", "NIT", "PAS")])
+        sesion.add_all([p.TipoVehiculo(nombre="carro"), p.TipoVehiculo(nombre="moto")])
+        sesion.flush()
+        sesion.add_all([p.Tarifa(tipo_vehiculo_id=1, tarifa_hora=200.0),
+                        p.Tarifa(tipo_vehiculo_id=2, tarifa_hora=100.0)])
+        sesion.add(p.ValorMinimo(valor=5000))
+        sesion.commit()
+    return app
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = nueva_app(tmp_path, monkeypatch)
+    yield app
+    with app.app_context():
+        for motor in p.db.engines.values():
+            motor.dispose()
+
+
+def crear_espacios(app, cantidad, tipo_vehiculo_id=1, sede_id=p.SEDE_PRINCIPAL):
+    with app.app_context():
+        espacios = [p.Espacio(tipo_vehiculo_id=tipo_vehiculo_id, sede_id=sede_id, estado=False)
+                    for _ in range(cantidad)]
+        p.db.session.add_all(espacios)
+        p.db.session.commit()
+        return [e.id for e in espacios]
+
+
+def crear_vehiculos(app, cantidad, tipo_vehiculo_id=1, saldo=100000):
+    # Un usuario por vehículo; devuelve [(vehiculo_id, placa, uid_rfid)]
+    with app.app_context():
+        creados = []
+        for i in range(cantidad):
+            usuario = p.Usuario(nombre=f"Usuario {i}", tipo_documento_id=1,
+                                numero_identificacion=f"ID{tipo_vehiculo_id}-{i:05d}")
+            usuario.saldo = saldo
+            vehiculo = p.Vehiculo(usuario=usuario, placa=f"T{tipo_vehiculo_id}{i:04d}",
+                                  tipo_vehiculo_id=tipo_vehiculo_id, uid_rfid=f"UID{tipo_vehiculo_id}{i:05d}")
+            p.db.session.add(vehiculo)
+            creados.append(vehiculo)
+        p.db.session.commit()
+        return [(v.id, v.placa, v.uid_rfid) for v in creados]
@@ -0,0 +1,78 @@
+# El historial de recargas de un usuario lee del archivo histórico solo los
+# meses donde ese usuario tiene recargas, no el archivo entero.
+from datetime import datetime, timedelta
+
+import pytest
+
+import parqueadero as p
+from conftest import crear_vehiculos
+
+MESES = 6
+
+
+@pytest.fixture
+def archivo(app, monkeypatch):
+    # Tres usuarios; el primero solo recarga en el mes más viejo, los otros
+    # todos los meses. Todo queda archivado.
+    crear_vehiculos(app, 3)
+    inicio = datetime.now().replace(day=15, hour=12, minute=0, second=0, microsecond=0) - timedelta(days=400)
+    with app.app_context():
+        for mes in range(MESES):
+            fecha = inicio + timedelta(days=31 * mes)
+            for usuario_id in (1, 2, 3):
+                if usuario_id == 1 and mes:
+                    continue
+                p.db.session.add(p.Recarga(usuario_id=usuario_id, monto_recargado=1000 + mes, saldo_anterior=0,
+                                           saldo_final=1000 + mes, referencia=f"R{usuario_id}-{mes}",
+                                           fecha_recarga=fecha))
+        p.db.session.commit()
+        assert p.archivar_historico(dias=30)["recargas"] == 1 + 2 * MESES
+
+    abiertos = []
+    leer_mes = p.archivo_historico._leer_mes
+
+    def contar(tabla, mes):
+        abiertos.append(mes)
+        return leer_mes(tabla, mes)
+    monkeypatch.setattr(p.archivo_historico, "_leer_mes", contar)
+    return abiertos
+
+
+def historial(app, usuario_id):
+    respuesta = app.test_client().get(f"/usuarios/{usuario_id}/recargas")
+    assert respuesta.status_code == 200
+    return [r["referencia"] for r in respuesta.get_json()["recargas"]]
+
+
+def test_historial_de_un_usuario_abre_solo_sus_meses(app, archivo):
+    assert historial(app, 1) == ["R1-0"]
+    assert len(archivo) == 1
+
+    archivo.clear()
+    assert historial(app, 2) == [f"R2-{mes}" for mes in reversed(range(MESES))]
+    assert len(archivo) == MESES
+
+
+def test_usuario_sin_recargas_archivadas_no_abre_el_archivo(app, archivo):
+    crear_vehiculos(app, 1, tipo_vehiculo_id=2)  # usuario 4
+    assert historial(app, 4) == []
+    assert archivo == []
+
+
+def test_indice_anterior_sin_claves_se_completa_al_archivar(app, archivo):
+    with app.app_context():
+        indice = p.archivo_historico.indice("recargas")
+        for datos in indice["meses"].values():
+            del datos["claves"]
+        p.archivo_historico._guardar_indice("recargas", indice)
+
+    # Sin claves se abren todos los meses, con el mismo resultado
+    assert historial(app, 1) == ["R1-0"]
+    assert len(archivo) == MESES
+
+    with app.app_context():
+        p.archivar_historico(dias=30)
+        assert all("claves" in datos for datos in p.archivo_historico.indice("recargas")["meses"].values())
+    archivo.clear()
+    assert historial(app, 1) == ["R1-0"]
+    assert len(archivo) == 1
@@ -0,0 +1,88 @@
+# Importar el módulo y atender solicitudes comunes no debe cargar la pila
+# de exportación (openpyxl) ni NumPy: se importan con el primer uso. Corre
+# en un proceso aparte porque este ya importó parqueadero y sus dependencias.
+# El mismo proceso mide importar, crear_app() y la primera solicitud; los
+# límites son holgados (una máquina lenta de CI) y solo atrapan regresiones
+# grandes, como volver a importar openpyxl al arrancar. Las medianas
+# comparables entre commits salen de benchmarks/benchmark.py --arranques.
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("openpyxl", "numpy")
+
+# Milisegundos máximos por etapa
+LIMITES_MS = {"importar_ms": 5000, "crear_app_ms": 1000, "primera_solicitud_ms": 2000}
+
+SCRIPT = """
+import json, sys, time
+pesados = %r
+cargados = lambda: [m for m in pesados if m in sys.modules]
+etapas, tiempos = {}, {}
+inicio = time.perf_counter()
+import parqueadero
+tiempos["importar_ms"] = (time.perf_counter() - inicio) * 1000
+etapas["importar"] = cargados()
+inicio = time.perf_counter()
+app = parqueadero.crear_app({"SQLALCHEMY_DATABASE_URI": sys.argv[1]})
+tiempos["crear_app_ms"] = (time.perf_counter() - inicio) * 1000
+etapas["crear_app"] = cargados()
+with app.app_context():
+    parqueadero.migrar()
+    parqueadero.db.engine.dispose()  # la primera solicitud abre su propia conexión
+cliente = app.test_client()
+# La primera solicitud paga la conexión y la carga de catálogos e índice
+for clave in ("primera_solicitud_ms", "segunda_solicitud_ms"):
+    inicio = time.perf_counter()
+    assert cliente.get("/parqueadero/estado").status_code == 200
+    tiempos[clave] = (time.perf_counter() - inicio) * 1000
+assert cliente.post("/rfid", json={"uid": "X", "tipo": "IN"}).status_code == 200
+etapas["solicitudes"] = cargados()
+assert cliente.get("/parqueadero/estado?formato=excel").status_code == 200
+etapas["exportar_excel"] = cargados()
+print(json.dumps({"etapas": etapas, "tiempos": tiempos}))
+""" % (PESADOS,)
+
+
+def ejecutar(*argumentos, entorno=None):
+    return subprocess.run([sys.executable, *argumentos], cwd=RAIZ, capture_output=True, text=True,
+                          env=dict(os.environ, **(entorno or {})), timeout=120)
+
+
+@pytest.fixture(scope="module")
+def arranque(tmp_path_factory):
+    base = tmp_path_factory.mktemp("arranque") / "arranque.db"
+    salida = ejecutar("-c", SCRIPT, f"sqlite:///{base}")
+    assert salida.returncode == 0, salida.stderr
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def test_importar_no_carga_modulos_pesados(arranque):
+    etapas = arranque["etapas"]
+    assert etapas["importar"] == []
+    assert etapas["crear_app"] == []
+    assert etapas["solicitudes"] == []
+    assert "openpyxl" in etapas["exportar_excel"]
+
+
+def test_tiempos_de_arranque(arranque, record_property):
+    tiempos = {clave: round(valor, 1) for clave, valor in arranque["tiempos"].items()}
+    for clave, valor in tiempos.items():
+        record_property(clave, valor)   # queda en el reporte JUnit (--junitxml)
+    print("Arranque:", ", ".join(f"{clave} {valor}" for clave, valor in tiempos.items()))
+
+    excedidos = {clave: tiempos[clave] for clave, limite in LIMITES_MS.items() if tiempos[clave] > limite}
+    assert not excedidos, f"Arranque más lento que {LIMITES_MS}: {tiempos}"
+
+
+def test_importar_y_crear_app_sin_base_de_datos(tmp_path):
+    # Sin base alcanzable: importar y crear la app no abren conexiones
+    inexistente = f"sqlite:///{tmp_path / 'no' / 'existe' / 'parqueadero.db'}"
+    salida = ejecutar("-c", "import parqueadero; parqueadero.crear_app(); print('ok')",
+                      entorno={"DATABASE_URL": inexistente})
+    assert salida.returncode == 0, salida.stderr
+    assert salida.stdout.strip().endswith("ok")
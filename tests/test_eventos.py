@@ -0,0 +1,60 @@
+# Canal de eventos compartido por archivo SQLite: lo que publica un worker
+# llega a los paneles de otro, la puerta solo paga un INSERT y los eventos
+# viejos se borran fuera de la solicitud.
+import queue
+import sqlite3
+import time
+
+import pytest
+
+import parqueadero as p
+
+
+def canal(app, tmp_path):
+    with app.app_context():
+        return p.CanalEventosSQLite(str(tmp_path / "eventos.db"))
+
+
+def test_evento_de_un_worker_llega_al_panel_de_otro(app, tmp_path):
+    publica, lee = canal(app, tmp_path), canal(app, tmp_path)
+    with app.app_context():
+        panel = lee.suscribir()
+        publica.publicar("rfid", {"uid": "UID1", "sede_id": p.SEDE_PRINCIPAL})
+    tipo, datos = panel.get(timeout=5)
+    assert (tipo, datos["uid"]) == ("rfid", "UID1")
+
+
+def test_publicar_es_un_solo_insert_por_una_conexion_del_proceso(app, tmp_path):
+    eventos = canal(app, tmp_path)
+    with app.app_context():
+        eventos.publicar("rfid", {"uid": "UID1"})
+        _, conexion = eventos._escritura
+        sentencias = []
+        conexion.set_trace_callback(sentencias.append)
+        for i in range(3):
+            eventos.publicar("rfid", {"uid": f"UID{i}"})
+    assert eventos._escritura[1] is conexion
+    assert len(sentencias) == 3 and all(s.startswith("INSERT INTO eventos") for s in sentencias)
+
+
+def test_podar_borra_solo_eventos_vencidos(app, tmp_path):
+    eventos = canal(app, tmp_path)
+    with app.app_context():
+        eventos.publicar("rfid", {"uid": "nuevo"})
+    with sqlite3.connect(eventos.ruta, isolation_level=None) as con:
+        con.execute("INSERT INTO eventos (tipo, datos, creado) VALUES ('rfid', '{}', ?)",
+                    (time.time() - eventos.RETENCION - 1,))
+        assert eventos.podar(con) == 1
+        assert con.execute("SELECT COUNT(*) FROM eventos").fetchone()[0] == 1
+
+
+def test_sin_paneles_no_se_reparten_eventos_viejos(app, tmp_path):
+    eventos = canal(app, tmp_path)
+    with app.app_context():
+        eventos.publicar("rfid", {"uid": "antes"})
+        time.sleep(eventos.INTERVALO * 3)
+        panel = eventos.suscribir()
+        eventos.publicar("rfid", {"uid": "despues"})
+    assert panel.get(timeout=5)[1]["uid"] == "despues"
+    with pytest.raises(queue.Empty):
+        panel.get(timeout=eventos.INTERVALO * 3)
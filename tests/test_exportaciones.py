@@ -0,0 +1,141 @@
+# Trabajos de exportación en segundo plano: crear, consultar, descargar,
+# reutilizar un trabajo igual y purgar por edad, tamaño y abandono.
+import json
+import os
+import time
+
+import pytest
+
+import parqueadero as p
+from conftest import crear_espacios, crear_vehiculos
+
+
+@pytest.fixture
+def cliente(app):
+    crear_espacios(app, 3)
+    cliente = app.test_client()
+    for _, _, uid in crear_vehiculos(app, 3):
+        assert cliente.post("/rfid", json={"uid": uid, "tipo": "IN"}).status_code == 200
+        assert cliente.post("/rfid", json={"uid": uid, "tipo": "OUT"}).status_code == 200
+    return cliente
+
+
+def exportar(cliente, **filtros):
+    respuesta = cliente.post("/exportaciones", json={"reporte": "registros", "formato": "csv", "filtros": filtros})
+    assert respuesta.status_code in (200, 202), respuesta.get_json()
+    return respuesta
+
+
+def esperar(cliente, trabajo_id, espera=10):
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        trabajo = cliente.get(f"/exportaciones/{trabajo_id}").get_json()
+        if trabajo["estado"] in ("listo", "error"):
+            return trabajo
+        time.sleep(0.05)
+    raise AssertionError(f"La exportación {trabajo_id} no terminó")
+
+
+def archivos(app):
+    return sorted(os.listdir(app.config['EXPORTACIONES_DIRECTORIO']))
+
+
+def test_exportar_consultar_descargar_y_reutilizar(app, cliente):
+    respuesta = exportar(cliente)
+    assert respuesta.status_code == 202
+    trabajo = esperar(cliente, respuesta.get_json()["id"])
+    assert trabajo["estado"] == "listo", trabajo
+
+    descarga = cliente.get(trabajo["descarga"])
+    assert descarga.status_code == 200
+    lineas = descarga.get_data(as_text=True).splitlines()
+    assert lineas[0].startswith("ID,Placa") and len(lineas) == 4
+
+    # El mismo pedido devuelve el trabajo ya hecho
+    repetido = exportar(cliente)
+    assert repetido.status_code == 200 and repetido.get_json()["id"] == trabajo["id"]
+
+
+def test_purgar_por_edad_y_por_tamano(app, cliente):
+    ids = []
+    for dia in ("2000-01-01", "2000-01-02", "2000-01-03"):
+        trabajo_id = exportar(cliente, fecha_inicio=dia).get_json()["id"]
+        assert esperar(cliente, trabajo_id)["estado"] == "listo"
+        ids.append(trabajo_id)
+        time.sleep(0.01)  # terminados en orden
+    with app.app_context():
+        trabajos = p.trabajos_exportacion
+        viejo = trabajos.obtener(ids[0])
+        viejo["terminado"] -= app.config['EXPORTACIONES_MAX_EDAD'] + 1
+        trabajos._guardar(viejo)
+        # Cabe solo el más nuevo: se expulsa del más viejo al más nuevo
+        nuevo = trabajos.obtener(ids[2])
+        app.config['EXPORTACIONES_MAX_MB'] = (nuevo["bytes"] + 1) / (1024 * 1024)
+        trabajos.purgar()
+        assert [t for t in ids if trabajos.obtener(t)] == [ids[2]]
+    assert archivos(app) == sorted([f"{ids[2]}.json", f"{ids[2]}.csv"])
+
+
+def test_trabajo_huerfano_se_da_por_fallido_y_se_purga(app, cliente):
+    # Un worker que murió a mitad deja el trabajo "procesando" sin latido
+    trabajo_id = exportar(cliente).get_json()["id"]
+    assert esperar(cliente, trabajo_id)["estado"] == "listo"
+    ruta = os.path.join(app.config['EXPORTACIONES_DIRECTORIO'], f"{trabajo_id}.json")
+    with open(ruta, encoding="utf-8") as f:
+        trabajo = json.load(f)
+    os.remove(os.path.join(app.config['EXPORTACIONES_DIRECTORIO'], trabajo["archivo"]))
+    trabajo.update(estado="procesando", archivo=None, terminado=None,
+                   actualizado=time.time() - app.config['EXPORTACIONES_TIMEOUT'] - 1)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(trabajo, f)
+    with open(os.path.join(app.config['EXPORTACIONES_DIRECTORIO'], f"{trabajo_id}.csv.tmp"), "w") as f:
+        f.write("ID,Placa\n")
+
+    assert cliente.get(f"/exportaciones/{trabajo_id}").get_json()["estado"] == "error"
+    # Un pedido igual no reutiliza el huérfano: crea otro y el huérfano se purga
+    nuevo = exportar(cliente)
+    assert nuevo.status_code == 202 and nuevo.get_json()["id"] != trabajo_id
+    assert esperar(cliente, nuevo.get_json()["id"])["estado"] == "listo"
+    assert not any(nombre.startswith(trabajo_id) for nombre in archivos(app))
+
+
+def test_trabajo_en_curso_con_latido_no_se_purga(app, cliente):
+    trabajo_id = exportar(cliente).get_json()["id"]
+    assert esperar(cliente, trabajo_id)["estado"] == "listo"
+    with app.app_context():
+        trabajos = p.trabajos_exportacion
+        trabajo = trabajos.obtener(trabajo_id)
+        trabajo.update(estado="procesando", terminado=None)
+        trabajos._guardar(trabajo)
+        trabajos.purgar()
+        assert trabajos.obtener(trabajo_id)["estado"] == "procesando"
+
+
+@pytest.mark.parametrize("reporte, filtros", [
+    ("registros", {"placa": 123}),
+    ("registros", {"espacio": "uno"}),
+    ("registros", {"fecha_inicio": "17/10/2026"}),
+    ("registros", {"sede_id": True}),
+    ("registros", {"usuario_id": "1"}),
+    ("recargas", {"placa": "T10000"}),
+    ("usuarios", {"sede_id": "1"}),
+])
+def test_filtros_invalidos_o_no_admitidos_dan_400(app, reporte, filtros):
+    respuesta = app.test_client().post("/exportaciones", json={"reporte": reporte, "formato": "csv", "filtros": filtros})
+    assert respuesta.status_code == 400, respuesta.get_json()
+    assert not os.path.isdir(app.config['EXPORTACIONES_DIRECTORIO']) or archivos(app) == []
+
+
+def test_exportar_recargas_de_un_usuario(app):
+    cliente = app.test_client()
+    crear_vehiculos(app, 2)
+    for identificacion in ("ID1-00000", "ID1-00001"):
+        respuesta = cliente.post("/usuarios/recargar", json={"numero_identificacion": identificacion, "monto": 10000})
+        assert respuesta.status_code == 201, respuesta.get_json()
+
+    trabajo = cliente.post("/exportaciones", json={"reporte": "recargas", "formato": "csv",
+                                                   "filtros": {"usuario_id": 2}}).get_json()
+    trabajo = esperar(cliente, trabajo["id"])
+    assert trabajo["filtros"] == {"usuario_id": "2"}
+    filas = cliente.get(trabajo["descarga"]).get_data(as_text=True).splitlines()[1:]
+    assert len(filas) == 1 and "ID1-00001" in filas[0]
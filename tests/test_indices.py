@@ -0,0 +1,134 @@
+# Las consultas calientes de puertas y reportes deben resolverse con índices
+# (EXPLAIN QUERY PLAN de SQLite), y la BD no admite dos estadías abiertas
+# del mismo vehículo.
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+import parqueadero as p
+from conftest import crear_espacios, crear_vehiculos
+
+# Tablas que crecen con el uso: nunca deben recorrerse completas
+TABLAS_GRANDES = ("registros", "recargas", "recaudo_horas", "movimientos_saldo")
+
+
+@contextmanager
+def capturar_consultas(app):
+    consultas = []
+
+    def oir(conn, cursor, sentencia, parametros, contexto, executemany):
+        if sentencia.lstrip().upper().startswith("SELECT"):
+            consultas.append((sentencia, parametros))
+
+    with app.app_context():
+        motor = p.db.engine
+    event.listen(motor, "before_cursor_execute", oir)
+    try:
+        yield consultas
+    finally:
+        event.remove(motor, "before_cursor_execute", oir)
+
+
+def planes(app, consultas):
+    # [(sentencia, [líneas del plan])]
+    with app.app_context():
+        conexion = p.db.engine.raw_connection()
+        try:
+            return [(sentencia, [fila[3] for fila in conexion.execute("EXPLAIN QUERY PLAN " + sentencia, parametros)])
+                    for sentencia, parametros in consultas]
+        finally:
+            conexion.close()
+
+
+def recorridos_completos(app, consultas):
+    patron = re.compile(rf"^SCAN ({'|'.join(TABLAS_GRANDES)})\b(?! USING)")
+    return [(" ".join(sentencia.split())[:120], linea)
+            for sentencia, lineas in planes(app, consultas) for linea in lineas if patron.match(linea)]
+
+
+def usa_indice(app, consultas, tabla, indices):
+    lineas = [linea for _, plan in planes(app, consultas) for linea in plan
+              if re.match(rf"^SEARCH {tabla} USING (COVERING )?INDEX", linea)]
+    return any(indice in linea for linea in lineas for indice in indices)
+
+
+@pytest.fixture
+def parqueadero(app):
+    crear_espacios(app, 4)
+    return app, crear_vehiculos(app, 2)
+
+
+def test_puerta_rfid_usa_indices(parqueadero):
+    app, [(_, _, uid), _] = parqueadero
+    cliente = app.test_client()
+    with capturar_consultas(app) as consultas:
+        assert cliente.post("/rfid", json={"uid": uid, "tipo": "IN"}).get_json()["status"] == "OK_IN"
+        p.cache_tarjetas.invalidar(uid)  # que la salida también consulte la BD
+        assert cliente.post("/rfid", json={"uid": uid, "tipo": "OUT"}).get_json()["status"] == "OK_OUT"
+
+    assert recorridos_completos(app, consultas) == []
+    assert usa_indice(app, consultas, "registros", ("ix_registros_vehiculo_salida", "ux_registros_estadia_abierta"))
+    assert usa_indice(app, consultas, "espacios", ("ix_espacios_sede_tipo_estado",))
+
+
+def test_salida_por_placa_usa_indices(parqueadero):
+    app, [_, (_, placa, _)] = parqueadero
+    cliente = app.test_client()
+    assert cliente.post("/parqueadero/asignar", json={"placa": placa}).status_code == 200
+    with capturar_consultas(app) as consultas:
+        assert cliente.post("/parqueadero/movimiento", json={"placa": placa}).status_code == 200
+
+    assert recorridos_completos(app, consultas) == []
+    assert usa_indice(app, consultas, "registros", ("ix_registros_vehiculo_salida", "ux_registros_estadia_abierta"))
+
+
+def test_reporte_pagos_usa_indices(parqueadero):
+    app, _ = parqueadero
+    anio = datetime.now().year
+    with capturar_consultas(app) as consultas:
+        respuesta = app.test_client().get(
+            f"/reportes/pagos?fecha_inicio={anio}-01-01&fecha_fin={anio}-12-31&agrupar=dia,tipo&detalle=1")
+        assert respuesta.status_code == 200
+
+    assert recorridos_completos(app, consultas) == []
+    assert usa_indice(app, consultas, "registros", ("ix_registros_hora_ingreso", "ix_registros_sede_hora_ingreso"))
+
+
+def test_historial_recargas_usa_indice(parqueadero):
+    app, _ = parqueadero
+    with capturar_consultas(app) as consultas:
+        assert app.test_client().get("/usuarios/1/recargas").status_code == 200
+
+    assert recorridos_completos(app, consultas) == []
+    assert usa_indice(app, consultas, "recargas", ("ix_recargas_usuario_fecha",))
+
+
+def test_una_sola_estadia_abierta_por_vehiculo(parqueadero):
+    app, [(vehiculo_id, _, _), _] = parqueadero
+    with app.app_context():
+        p.db.session.add(p.Registro(vehiculo_id=vehiculo_id, espacio_id=1, hora_ingreso=datetime.now()))
+        p.db.session.commit()
+
+        p.db.session.add(p.Registro(vehiculo_id=vehiculo_id, espacio_id=2, hora_ingreso=datetime.now()))
+        with pytest.raises(IntegrityError):
+            p.db.session.commit()
+        p.db.session.rollback()
+
+        # Las estadías cerradas no cuentan
+        p.db.session.add(p.Registro(vehiculo_id=vehiculo_id, espacio_id=2, hora_ingreso=datetime.now(),
+                                    hora_salida=datetime.now()))
+        p.db.session.commit()
+
+
+def test_ingreso_con_estadia_abierta_se_rechaza(parqueadero):
+    app, [_, (vehiculo_id, _, _)] = parqueadero
+    with app.app_context():
+        vehiculo = p.db.session.get(p.Vehiculo, vehiculo_id)
+        p.registrar_ingreso(vehiculo)
+        with pytest.raises(p.VehiculoYaAdentroError):
+            p.registrar_ingreso(vehiculo)
+        assert p.Espacio.query.filter_by(estado=True).count() == 1
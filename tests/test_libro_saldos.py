@@ -0,0 +1,123 @@
+# Libro de saldos: recargas y cobros concurrentes sobre el mismo usuario no
+# pierden actualizaciones y cada movimiento deja el saldo en centavos exactos.
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Barrier
+
+from sqlalchemy import func
+
+import parqueadero as p
+from conftest import crear_espacios
+
+RECARGAS = 30
+SALIDAS = 10
+
+
+def crear_usuario(app, saldo=0, vehiculos=0, horas_adentro=2):
+    # Usuario con `vehiculos` carros, todos con una estadía abierta
+    with app.app_context():
+        usuario = p.Usuario(nombre="Cliente", tipo_documento_id=1, numero_identificacion="900")
+        usuario.saldo = saldo
+        p.db.session.add(usuario)
+        carros = [p.Vehiculo(usuario=usuario, placa=f"LIB{i:03d}", tipo_vehiculo_id=1) for i in range(vehiculos)]
+        p.db.session.add_all(carros)
+        p.db.session.commit()
+        for carro in carros:
+            p.registrar_ingreso(carro, hora_ingreso=datetime.now() - timedelta(hours=horas_adentro))
+        return usuario.id, [c.placa for c in carros]
+
+
+def en_paralelo(app, llamadas):
+    barrera = Barrier(len(llamadas))
+
+    def ejecutar(llamada):
+        ruta, cuerpo = llamada
+        cliente = app.test_client()
+        barrera.wait()
+        return cliente.post(ruta, json=cuerpo)
+
+    with ThreadPoolExecutor(max_workers=len(llamadas)) as hilos:
+        return list(hilos.map(ejecutar, llamadas))
+
+
+def libro(app, usuario_id):
+    with app.app_context():
+        usuario = p.db.session.get(p.Usuario, usuario_id)
+        movimientos = p.MovimientoSaldo.query.filter_by(usuario_id=usuario_id).order_by(p.MovimientoSaldo.id).all()
+        return usuario.saldo_centavos, [(m.tipo, m.monto_centavos, m.saldo_centavos) for m in movimientos]
+
+
+def encadenado(movimientos, inicial):
+    # Cada movimiento parte del saldo que dejó el anterior
+    saldo = inicial
+    for _, monto, resultante in movimientos:
+        if saldo + monto != resultante:
+            return False
+        saldo = resultante
+    return True
+
+
+def test_recargas_concurrentes_no_pierden_saldo(app):
+    usuario_id, _ = crear_usuario(app, saldo=10)
+
+    respuestas = en_paralelo(app, [("/usuarios/recargar", {"numero_identificacion": "900", "monto": "1234.56"})
+                                   for _ in range(RECARGAS)])
+
+    assert [r.status_code for r in respuestas] == [201] * RECARGAS
+    saldo, movimientos = libro(app, usuario_id)
+    assert saldo == 1000 + RECARGAS * 123456
+    assert [tipo for tipo, _, _ in movimientos] == ["RECARGA"] * RECARGAS
+    assert encadenado(movimientos, 1000)
+    with app.app_context():
+        assert p.db.session.query(func.count(p.Recarga.id)).scalar() == RECARGAS
+
+
+def test_salidas_y_recargas_concurrentes_cuadran(app):
+    crear_espacios(app, SALIDAS)
+    usuario_id, placas = crear_usuario(app, saldo=100000, vehiculos=SALIDAS)
+
+    en_paralelo(app, [("/parqueadero/movimiento", {"placa": placa}) for placa in placas]
+                + [("/usuarios/recargar", {"numero_identificacion": "900", "monto": 500}) for _ in range(RECARGAS)])
+
+    saldo, movimientos = libro(app, usuario_id)
+    with app.app_context():
+        cerrados = p.Registro.query.filter(p.Registro.hora_salida.isnot(None)).all()
+        assert len(cerrados) == SALIDAS
+        cobrado = sum(p.a_centavos(r.total_pago) for r in cerrados)
+    assert cobrado > 0
+    assert saldo == 100000 * 100 + RECARGAS * 50000 - cobrado
+    assert sorted(tipo for tipo, _, _ in movimientos) == ["COBRO"] * SALIDAS + ["RECARGA"] * RECARGAS
+    assert encadenado(movimientos, 100000 * 100)
+
+
+def test_salida_sin_fondos_no_toca_nada(app):
+    crear_espacios(app, 1)
+    usuario_id, [placa] = crear_usuario(app, saldo=0, vehiculos=1)
+
+    respuesta = app.test_client().post("/parqueadero/movimiento", json={"placa": placa})
+
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()["saldo_actual"] == 0
+    saldo, movimientos = libro(app, usuario_id)
+    assert (saldo, movimientos) == (0, [])
+    with app.app_context():
+        assert p.Registro.query.filter(p.Registro.hora_salida.is_(None)).count() == 1
+        assert p.Espacio.query.filter_by(estado=True).count() == 1
+        assert p.db.session.query(func.count(p.RecaudoHora.hora)).scalar() == 0
+
+
+def test_montos_en_centavos_exactos(app):
+    usuario_id, _ = crear_usuario(app)
+    cliente = app.test_client()
+    for monto in ("0.1", "0.2", 0.1, "10.005"):
+        assert cliente.post("/usuarios/recargar", json={"numero_identificacion": "900", "monto": monto}).status_code == 201
+
+    saldo, movimientos = libro(app, usuario_id)
+    # 10.005 se redondea hacia arriba (redondeo comercial)
+    assert [monto for _, monto, _ in movimientos] == [10, 20, 10, 1001]
+    assert saldo == 1041
+    with app.app_context():
+        assert p.db.session.get(p.Usuario, usuario_id).saldo == 10.41
+
+    assert cliente.post("/usuarios/recargar", json={"numero_identificacion": "900", "monto": "abc"}).status_code == 400
+    assert cliente.post("/usuarios/recargar", json={"numero_identificacion": "900", "monto": "-5"}).status_code == 400
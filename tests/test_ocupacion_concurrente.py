@@ -0,0 +1,91 @@
+# Entradas simultáneas: muchas puertas compiten por pocos espacios y ninguno
+# puede quedar asignado dos veces ni con un registro de más.
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from sqlalchemy import func
+
+import parqueadero as p
+from conftest import crear_espacios, crear_vehiculos
+
+ENTRADAS = 60
+ESPACIOS = 8
+
+
+def disparar(app, cuerpos):
+    # Cada hilo es una puerta con su propio cliente; la barrera los suelta juntos
+    barrera = Barrier(len(cuerpos))
+
+    def tocar(cuerpo):
+        cliente = app.test_client()
+        barrera.wait()
+        return cliente.post("/rfid", json=cuerpo).get_json()
+
+    with ThreadPoolExecutor(max_workers=len(cuerpos)) as hilos:
+        return list(hilos.map(tocar, cuerpos))
+
+
+def libres_restantes(app, vehiculos):
+    # Cuántos de `vehiculos` logran entrar uno tras otro. El índice en memoria
+    # solo propone candidatos (una recarga en plena carrera puede traer un
+    # espacio ya reclamado); lo que importa es que los libres sigan siendo usables.
+    cliente = app.test_client()
+    return sum(cliente.post("/rfid", json={"uid": uid, "tipo": "IN"}).get_json()["status"] == "OK_IN"
+               for _, _, uid in vehiculos)
+
+
+def test_entradas_concurrentes_no_duplican_espacios(app):
+    espacios = crear_espacios(app, ESPACIOS)
+    crear_espacios(app, 3, tipo_vehiculo_id=2)  # de moto: no deben tocarse
+    vehiculos = crear_vehiculos(app, ENTRADAS + 1)
+    vehiculos, tardio = vehiculos[:ENTRADAS], vehiculos[ENTRADAS:]
+
+    respuestas = disparar(app, [{"uid": uid, "tipo": "IN"} for _, _, uid in vehiculos])
+
+    estados = [r["status"] for r in respuestas]
+    assert estados.count("OK_IN") == ESPACIOS
+    assert all(r["line1"] == "Sin espacios" for r in respuestas if r["status"] != "OK_IN")
+
+    with app.app_context():
+        abiertos = p.Registro.query.filter(p.Registro.hora_salida.is_(None)).all()
+        assert len(abiertos) == ESPACIOS
+        assert sorted(r.espacio_id for r in abiertos) == espacios
+        assert len({r.vehiculo_id for r in abiertos}) == ESPACIOS
+
+        ocupados = p.Espacio.query.filter_by(estado=True).all()
+        assert sorted(e.id for e in ocupados) == espacios
+        # Cada espacio ocupado apunta al vehículo de su registro abierto
+        assert {(e.id, e.vehiculo_id) for e in ocupados} == {(r.espacio_id, r.vehiculo_id) for r in abiertos}
+    assert libres_restantes(app, tardio) == 0
+
+
+def test_misma_tarjeta_en_varias_puertas_abre_una_estadia(app):
+    crear_espacios(app, ESPACIOS)
+    [(_, _, uid), *otros] = crear_vehiculos(app, ESPACIOS)
+
+    respuestas = disparar(app, [{"uid": uid, "tipo": "IN", "puerta": f"P{i}"} for i in range(10)])
+
+    assert [r["status"] for r in respuestas].count("OK_IN") == 1
+    with app.app_context():
+        assert p.db.session.query(func.count(p.Registro.id)).scalar() == 1
+        assert p.Espacio.query.filter_by(estado=True).count() == 1
+    # Los espacios que tomaron las puertas rechazadas siguen disponibles
+    assert libres_restantes(app, otros) == ESPACIOS - 1
+
+
+def test_salidas_y_entradas_concurrentes_reusan_espacios(app):
+    crear_espacios(app, ESPACIOS)
+    vehiculos = crear_vehiculos(app, ESPACIOS * 3)
+    adentro, afuera, tardios = vehiculos[:ESPACIOS], vehiculos[ESPACIOS:2 * ESPACIOS], vehiculos[2 * ESPACIOS:]
+    assert all(r["status"] == "OK_IN" for r in disparar(app, [{"uid": uid, "tipo": "IN"} for _, _, uid in adentro]))
+
+    disparar(app, [{"uid": uid, "tipo": "OUT"} for _, _, uid in adentro]
+             + [{"uid": uid, "tipo": "IN"} for _, _, uid in afuera])
+
+    with app.app_context():
+        abiertos = p.Registro.query.filter(p.Registro.hora_salida.is_(None)).all()
+        ocupados = p.Espacio.query.filter_by(estado=True).all()
+        assert len({r.espacio_id for r in abiertos}) == len(abiertos) == len(ocupados)
+        assert {(e.id, e.vehiculo_id) for e in ocupados} == {(r.espacio_id, r.vehiculo_id) for r in abiertos}
+    # Todo espacio liberado en la carrera puede volver a usarse
+    assert libres_restantes(app, tardios) == ESPACIOS - len(ocupados)
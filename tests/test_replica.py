@@ -0,0 +1,154 @@
+# Con una réplica de lectura, los reportes y listados leen de ella y las
+# puertas y el tablero nunca la tocan. Si la réplica se atrasa o no responde,
+# todo vuelve a la primaria, y medir su retraso no detiene a las solicitudes.
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import has_request_context, request
+from sqlalchemy import event
+
+import parqueadero as p
+from conftest import crear_espacios, crear_vehiculos, nueva_app
+
+RUTAS_REPLICA = ("/usuarios", "/registros", "/reportes/pagos")
+RUTAS_PRIMARIA = ("/rfid", "/parqueadero/estado")
+
+
+class ContadorRuteo:
+    # Sentencias de cada endpoint en la primaria y en la réplica
+    def __init__(self, app):
+        self._lock = threading.Lock()
+        self.endpoints = {}     # endpoint -> {"primaria": n, "replica": n}
+        self.escrituras_replica = []
+
+        def escuchar(destino):
+            def contar(conn, cursor, sentencia, parametros, contexto, executemany):
+                endpoint = request.url_rule.rule if has_request_context() and request.url_rule else "sin_solicitud"
+                with self._lock:
+                    self.endpoints.setdefault(endpoint, {"primaria": 0, "replica": 0})[destino] += 1
+                    if destino == "replica" and sentencia.lstrip().split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+                        self.escrituras_replica.append(sentencia)
+            return contar
+
+        with app.app_context():
+            event.listen(p.db.engine, "before_cursor_execute", escuchar("primaria"))
+            event.listen(p.db.engines[p.BIND_LECTURA], "before_cursor_execute", escuchar("replica"))
+
+    def en(self, endpoint, destino):
+        return self.endpoints.get(endpoint, {}).get(destino, 0)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    replica = tmp_path / "replica.db"
+    app = nueva_app(tmp_path, monkeypatch, SQLALCHEMY_DATABASE_URI_LECTURA=f"sqlite:///{replica}",
+                    LECTURA_MAX_RETRASO=30)
+    crear_espacios(app, 4)
+    crear_vehiculos(app, 4)
+    # La réplica arranca como copia de la primaria sembrada
+    with app.app_context():
+        origen = p.db.engine.url.database
+    with sqlite3.connect(origen) as fuente, sqlite3.connect(replica) as copia:
+        fuente.backup(copia)
+    yield app
+    with app.app_context():
+        for motor in p.db.engines.values():
+            motor.dispose()
+
+
+def medir(app, espera=5.0):
+    # Lanza una medición del retraso y espera a que termine
+    with app.test_request_context():
+        p.estado_replica.disponible(p.db.engines[p.BIND_LECTURA])
+    limite = time.monotonic() + espera
+    while p.estado_replica._midiendo and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert not p.estado_replica._midiendo
+
+
+def recorrer(app):
+    # Carga mixta: puertas, tablero y reportes
+    cliente = app.test_client()
+    hoy = time.strftime("%Y-%m-%d")
+    for i in range(4):
+        assert cliente.post("/rfid", json={"uid": f"UID1{i:05d}", "tipo": "IN"}).status_code == 200
+    assert cliente.get("/parqueadero/estado").status_code == 200
+    assert cliente.get("/usuarios").status_code == 200
+    assert cliente.get("/registros").get_data()  # en streaming: consulta al leer el cuerpo
+    assert cliente.get("/reportes/pagos", query_string={"fecha_inicio": hoy, "fecha_fin": hoy}).status_code == 200
+    for i in range(4):
+        assert cliente.post("/rfid", json={"uid": f"UID1{i:05d}", "tipo": "OUT"}).status_code == 200
+
+
+def test_reportes_leen_de_la_replica_y_puertas_de_la_primaria(app):
+    medir(app)
+    contador = ContadorRuteo(app)
+    recorrer(app)
+
+    for ruta in RUTAS_REPLICA:
+        assert contador.en(ruta, "replica"), f"{ruta} no usó la réplica"
+    for ruta in RUTAS_PRIMARIA:
+        assert contador.en(ruta, "primaria"), f"{ruta} no llegó a la base"
+        assert not contador.en(ruta, "replica"), f"{ruta} leyó de la réplica"
+    assert contador.escrituras_replica == []
+
+
+def test_antes_de_la_primera_medicion_se_lee_de_la_primaria(app, monkeypatch):
+    liberar = threading.Event()
+    monkeypatch.setattr(p.estado_replica, "_medir", lambda motor: liberar.wait(5) and 0.0)
+    contador = ContadorRuteo(app)
+
+    assert app.test_client().get("/usuarios").status_code == 200
+    liberar.set()
+    assert contador.en("/usuarios", "primaria") and not contador.en("/usuarios", "replica")
+
+
+@pytest.mark.parametrize("retraso", [100.0, None])
+def test_replica_atrasada_o_caida_vuelve_a_la_primaria(app, monkeypatch, retraso):
+    def medir_replica(motor):
+        if retraso is None:
+            raise ConnectionError("réplica caída")
+        return retraso
+    monkeypatch.setattr(p.estado_replica, "_medir", medir_replica)
+    medir(app)
+    contador = ContadorRuteo(app)
+    recorrer(app)
+
+    for ruta in RUTAS_REPLICA + RUTAS_PRIMARIA:
+        assert not contador.en(ruta, "replica"), f"{ruta} leyó de una réplica no disponible"
+    assert contador.en("/usuarios", "primaria")
+
+
+def test_medicion_lenta_no_detiene_las_lecturas(app, monkeypatch):
+    medir(app)
+    # La medición vence y la siguiente tarda: una réplica que no contesta
+    # hasta el connect_timeout
+    liberar = threading.Event()
+    llamadas = []
+
+    def medir_lento(motor):
+        llamadas.append(motor)
+        liberar.wait(5)
+        return 0.0
+    monkeypatch.setattr(p.estado_replica, "_medir", medir_lento)
+    p.estado_replica._medido -= p.INTERVALO_RETRASO
+    contador = ContadorRuteo(app)
+
+    def leer(_):
+        inicio = time.monotonic()
+        assert app.test_client().get("/usuarios").status_code == 200
+        return time.monotonic() - inicio
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as grupo:
+            duraciones = list(grupo.map(leer, range(16)))
+    finally:
+        liberar.set()
+
+    # Nadie esperó la medición; siguieron con el último retraso conocido
+    assert max(duraciones) < 2, duraciones
+    assert len(llamadas) == 1
+    assert contador.en("/usuarios", "replica") and not contador.en("/usuarios", "primaria")
@@ -0,0 +1,109 @@
+# Con varias sedes, cada reporte y cada stream del tablero hablan de una sola
+# sede: los totales de /reportes/pagos cuadran con su detalle.
+from datetime import datetime, timedelta
+
+import pytest
+
+import parqueadero as p
+from conftest import crear_espacios, crear_vehiculos
+
+NORTE = 2
+
+
+@pytest.fixture
+def dos_sedes(app):
+    with app.app_context():
+        p.db.session.add(p.Sede(id=NORTE, nombre="Norte"))
+        p.db.session.commit()
+    principal = crear_espacios(app, 3)
+    norte = crear_espacios(app, 3, sede_id=NORTE)
+    return principal, norte
+
+
+def estadias(app, sede_id, cantidad, horas=2):
+    # `cantidad` estadías cerradas en la sede, entradas hace `horas` horas
+    cliente = app.test_client()
+    vehiculos = crear_vehiculos(app, cantidad, tipo_vehiculo_id=1 if sede_id == p.SEDE_PRINCIPAL else 2)
+    with app.app_context():
+        for vehiculo_id, _, _ in vehiculos:
+            p.registrar_ingreso(p.db.session.get(p.Vehiculo, vehiculo_id),
+                                hora_ingreso=datetime.now() - timedelta(hours=horas), sede_id=sede_id)
+    for _, placa, _ in vehiculos:
+        assert cliente.post("/parqueadero/movimiento", json={"placa": placa}).status_code == 200
+
+
+def reporte(app, **parametros):
+    hoy = datetime.now().date()
+    parametros = dict(fecha_inicio=str(hoy - timedelta(days=1)), fecha_fin=str(hoy), detalle=1, **parametros)
+    respuesta = app.test_client().get("/reportes/pagos", query_string=parametros)
+    assert respuesta.status_code == 200, respuesta.get_json()
+    return respuesta.get_json()
+
+
+def test_reporte_pagos_por_sede_cuadra_con_su_detalle(app, dos_sedes):
+    crear_espacios(app, 3, tipo_vehiculo_id=2, sede_id=NORTE)
+    estadias(app, p.SEDE_PRINCIPAL, 2)
+    estadias(app, NORTE, 3)
+
+    todas = reporte(app)
+    for sede_id, cantidad in ((p.SEDE_PRINCIPAL, 2), (NORTE, 3)):
+        datos = reporte(app, sede_id=sede_id)
+        assert datos["total_registros"] == len(datos["registros"]) == cantidad
+        assert datos["total_ingresos"] == round(sum(r["total_pago"] for r in datos["registros"]), 2)
+    assert todas["total_registros"] == 5
+
+    grupos = {g["sede"]: g["registros"] for g in reporte(app, agrupar="sede")["grupos"]}
+    assert grupos == {p.SEDE_PRINCIPAL: 2, NORTE: 3}
+
+
+def test_reconstruir_recaudo_conserva_la_sede(app, dos_sedes):
+    crear_espacios(app, 3, tipo_vehiculo_id=2, sede_id=NORTE)
+    estadias(app, p.SEDE_PRINCIPAL, 1)
+    estadias(app, NORTE, 2)
+    antes = reporte(app, sede_id=NORTE)
+
+    assert app.test_client().post("/admin/recaudo/reconstruir", json={}).status_code == 200
+
+    despues = reporte(app, sede_id=NORTE)
+    assert (despues["total_registros"], despues["total_ingresos"]) == (antes["total_registros"], antes["total_ingresos"])
+
+
+def test_puesto_solo_acepta_espacios_de_su_sede(app, dos_sedes):
+    principal, norte = dos_sedes
+    cliente = app.test_client()
+
+    # Sin sede_id el controlador es de la sede del despliegue
+    datos = cliente.post("/puesto", json={"eventos": [{"puesto": principal[0], "estado": "OCUPADO"},
+                                                      {"puesto": norte[0], "estado": "OCUPADO"},
+                                                      {"puesto": 999, "estado": "OCUPADO"}]}).get_json()
+    assert datos["aceptados"] == 1
+    assert [e["indice"] for e in datos["errores"]] == [1, 2]
+
+    datos = cliente.post("/puesto", json={"sede_id": NORTE, "puesto": norte[0], "estado": "OCUPADO"}).get_json()
+    assert (datos["aceptados"], datos["errores"]) == (1, [])
+
+
+def test_eventos_de_sensores_llegan_solo_a_su_sede(app, dos_sedes):
+    _, norte = dos_sedes
+    app.config["SENSORES_REBOTE_MS"] = 0
+    with app.app_context():
+        canal = p.canal_eventos()
+        panel_principal, panel_norte = canal.suscribir(p.SEDE_PRINCIPAL), canal.suscribir(NORTE)
+
+    app.test_client().post("/puesto", json={"sede_id": NORTE, "puesto": norte[1], "estado": "OCUPADO"})
+    with app.app_context():
+        assert p.agregador_sensores.volcar() == 1
+        assert p.db.session.get(p.Espacio, norte[1]).ocupado_sensor is True
+
+    assert panel_norte.get_nowait() == ("sensor", {"id": norte[1], "ocupado": True, "sede_id": NORTE})
+    assert panel_principal.empty()
+
+
+def test_stream_sin_sede_usa_la_del_despliegue(app, dos_sedes):
+    app.config["SEDE"] = NORTE
+    with app.test_request_context("/parqueadero/eventos"):
+        respuesta = p.eventos_parqueadero()
+        canal = p.canal_eventos()
+        assert list(canal._suscriptores.values()) == [NORTE]
+        respuesta.close()
+    assert app.test_client().get("/parqueadero/eventos?sede_id=x").status_code == 400